@@ -46,3 +46,21 @@ def run_async_tasks(
         # is not supported
         raise RuntimeError("Fatal error occurred while running async tasks.", e) from e
     return outputs
+
+
+def run_async(coroutine: Coroutine) -> Any:
+    """Run a coroutine to completion from sync code."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # if running in notebook, use nest_asyncio to hijack the event loop
+    try:
+        import nest_asyncio
+    except ImportError:
+        raise RuntimeError(
+            "nest_asyncio is required to run async tasks in jupyter. Please install it via `pip install nest_asyncio`."  # noqa
+        )
+    nest_asyncio.apply()
+    return loop.run_until_complete(coroutine)
@@ -1,5 +1,6 @@
 from ragas.embeddings.base import (
     BaseRagasEmbeddings,
+    CachedRagasEmbeddings,
     HuggingfaceEmbeddings,
     LangchainEmbeddingsWrapper,
 )
@@ -7,5 +8,6 @@ from ragas.embeddings.base import (
 __all__ = [
     "HuggingfaceEmbeddings",
     "BaseRagasEmbeddings",
+    "CachedRagasEmbeddings",
     "LangchainEmbeddingsWrapper",
 ]
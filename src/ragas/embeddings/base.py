@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import os
+import sqlite3
 import typing as t
 from abc import ABC
+from contextlib import closing
 from dataclasses import field
 from typing import List
 
@@ -12,12 +16,16 @@ from langchain_openai.embeddings import OpenAIEmbeddings
 from pydantic.dataclasses import dataclass
 
 from ragas.run_config import RunConfig, add_async_retry, add_retry
+from ragas.utils import get_cache_dir, get_model_name
 
 DEFAULT_MODEL_NAME = "BAAI/bge-small-en-v1.5"
 
 
 class BaseRagasEmbeddings(Embeddings, ABC):
     run_config: RunConfig
+    # errors the provider raises when it rejects a batch as a whole (e.g. too
+    # many tokens), as opposed to transient errors that a retry can fix
+    rejected_batch_exceptions: t.Tuple[t.Type[BaseException], ...] = ()
 
     async def embed_text(self, text: str, is_async=True) -> List[float]:
         embs = await self.embed_texts([text], is_async=is_async)
@@ -69,13 +77,113 @@ class LangchainEmbeddingsWrapper(BaseRagasEmbeddings):
         # run configurations specially for OpenAI
         if isinstance(self.embeddings, OpenAIEmbeddings):
             try:
-                from openai import RateLimitError
+                from openai import BadRequestError, RateLimitError
             except ImportError:
                 raise ImportError(
                     "openai.error.RateLimitError not found. Please install openai package as `pip install openai`"
                 )
             self.embeddings.request_timeout = run_config.timeout
             self.run_config.exception_types = RateLimitError
+            self.rejected_batch_exceptions = (BadRequestError,)
+
+
+class CachedRagasEmbeddings(BaseRagasEmbeddings):
+    """
+    Wraps a BaseRagasEmbeddings and caches the document embeddings on disk in a
+    SQLite database keyed by (sha256(text), model name), so that only the texts
+    that were never embedded before hit the embedding provider. Query
+    embeddings are not cached.
+    """
+
+    def __init__(
+        self,
+        embeddings: BaseRagasEmbeddings,
+        cache_dir: t.Optional[str] = None,
+        model_name: t.Optional[str] = None,
+        run_config: t.Optional[RunConfig] = None,
+    ):
+        self.embeddings = embeddings
+        if model_name is None:
+            model_name = get_model_name(embeddings)
+        self.model_name = model_name
+
+        if cache_dir is None:
+            cache_dir = get_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_path = os.path.join(cache_dir, "embeddings.sqlite")
+        with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS emb "
+                "(hash BLOB, model TEXT, vec BLOB, PRIMARY KEY (hash, model))"
+            )
+
+        if run_config is None:
+            run_config = RunConfig()
+        self.set_run_config(run_config)
+
+    def _lookup(self, texts: List[str]) -> t.Tuple[List[bytes], t.Dict, t.Dict]:
+        """
+        returns the cache keys for the texts, the cached embeddings and the
+        texts that still need to be embedded (both keyed by cache key)
+        """
+        keys = [hashlib.sha256(text.encode("utf-8")).digest() for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        cached = {}
+        with closing(sqlite3.connect(self.cache_path)) as conn:
+            # stay well below SQLite's limit on the number of host parameters
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start : start + 500]
+                rows = conn.execute(
+                    "SELECT hash, vec FROM emb WHERE model = ? AND hash IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    [self.model_name, *chunk],
+                )
+                for key, vec in rows:
+                    cached[key] = np.frombuffer(vec, dtype=np.float64).tolist()
+        missing = {k: text for k, text in zip(keys, texts) if k not in cached}
+        return keys, cached, missing
+
+    def _store(self, embeddings: t.Dict[bytes, List[float]]):
+        with closing(sqlite3.connect(self.cache_path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO emb (hash, model, vec) VALUES (?, ?, ?)",
+                [
+                    (key, self.model_name, np.asarray(vec, dtype=np.float64).tobytes())
+                    for key, vec in embeddings.items()
+                ],
+            )
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(texts)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_embeddings = dict(zip(missing.keys(), vectors))
+            self._store(new_embeddings)
+            cached.update(new_embeddings)
+        return [cached[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(texts)
+        if missing:
+            vectors = await self.embeddings.aembed_documents(list(missing.values()))
+            new_embeddings = dict(zip(missing.keys(), vectors))
+            self._store(new_embeddings)
+            cached.update(new_embeddings)
+        return [cached[key] for key in keys]
+
+    @property
+    def rejected_batch_exceptions(self) -> t.Tuple[t.Type[BaseException], ...]:  # type: ignore
+        return self.embeddings.rejected_batch_exceptions
+
+    def set_run_config(self, run_config: RunConfig):
+        self.run_config = run_config
+        self.embeddings.set_run_config(run_config)
 
 
 @dataclass
@@ -1,7 +1,15 @@
-from ragas.llms.base import BaseRagasLLM, LangchainLLMWrapper, llm_factory
+from ragas.llms.base import (
+    BaseRagasLLM,
+    LangchainLLMWrapper,
+    SemanticLLMCache,
+    llm_factory,
+)
+from ragas.llms.batch import OpenAIBatchLLM
 
 __all__ = [
     "BaseRagasLLM",
     "LangchainLLMWrapper",
+    "OpenAIBatchLLM",
+    "SemanticLLMCache",
     "llm_factory",
 ]
@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from functools import partial
 
+import numpy as np
 from langchain_community.chat_models import ChatVertexAI
 from langchain_community.llms import VertexAI
 from langchain_core.language_models import BaseLanguageModel
@@ -20,6 +21,7 @@ from ragas.run_config import RunConfig, add_async_retry, add_retry
 if t.TYPE_CHECKING:
     from langchain_core.callbacks import Callbacks
 
+    from ragas.embeddings.base import BaseRagasEmbeddings
     from ragas.llms.prompt import PromptValue
 
 logger = logging.getLogger(__name__)
@@ -203,6 +205,162 @@ class LangchainLLMWrapper(BaseRagasLLM):
             self.run_config.exception_types = RateLimitError
 
 
+class SemanticLLMCache(BaseRagasLLM):
+    """
+    Wraps a BaseRagasLLM and reuses an earlier completion of the same prompt
+    template when the new inputs are close enough to inputs that were already
+    answered, i.e. when the cosine similarity of their embeddings is at least
+    `threshold`. Only the inputs are embedded, and each template has its own
+    cache, so the outputs of different prompts are never mixed up.
+
+    Prompts that were not created by `Prompt.format` and multiple completions
+    (n > 1) are not cached. The cache lives in memory.
+
+    A cached completion is reused for inputs that are similar but not the
+    same, so keep `threshold` high: for the testset filters it means that a
+    near-duplicate question or chunk gets the verdict of the earlier one.
+    """
+
+    def __init__(
+        self,
+        llm: BaseRagasLLM,
+        embeddings: BaseRagasEmbeddings,
+        threshold: float = 0.97,
+        run_config: t.Optional[RunConfig] = None,
+    ):
+        self.llm = llm
+        self.embeddings = embeddings
+        self.threshold = threshold
+        # per prompt template, the L2-normalized embeddings of the inputs, one
+        # row per cached completion
+        self.input_embeddings: t.Dict[str, np.ndarray] = {}
+        self.completions: t.Dict[str, t.List[LLMResult]] = {}
+        if run_config is None:
+            run_config = llm.run_config
+        self.set_run_config(run_config)
+
+    @staticmethod
+    def _is_cacheable(prompt: PromptValue, n: int) -> bool:
+        return n == 1 and prompt.template is not None
+
+    @staticmethod
+    def _inputs_to_string(prompt: PromptValue) -> str:
+        inputs = prompt.inputs or {}
+        return "\n".join(f"{key}: {inputs[key]}" for key in sorted(inputs))
+
+    def _normalize(self, embedding: t.List[float]) -> np.ndarray:
+        embedding_np = np.asarray(embedding, dtype=np.float64)
+        norm = np.linalg.norm(embedding_np)
+        return embedding_np / norm if norm > 0 else embedding_np
+
+    def _lookup(self, template: str, embedding: np.ndarray) -> t.Optional[LLMResult]:
+        completions = self.completions.get(template)
+        if not completions:
+            return None
+        scores = self.input_embeddings[template] @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            logger.debug("semantic cache hit with similarity %s", scores[best])
+            return completions[best]
+        return None
+
+    def _add(self, template: str, embedding: np.ndarray, completion: LLMResult):
+        if template in self.completions:
+            self.input_embeddings[template] = np.vstack(
+                [self.input_embeddings[template], embedding]
+            )
+            self.completions[template].append(completion)
+        else:
+            self.input_embeddings[template] = embedding[np.newaxis, :]
+            self.completions[template] = [completion]
+
+    def generate_text(
+        self,
+        prompt: PromptValue,
+        n: int = 1,
+        temperature: float = 1e-8,
+        stop: t.Optional[t.List[str]] = None,
+        callbacks: Callbacks = [],
+    ) -> LLMResult:
+        if not self._is_cacheable(prompt, n):
+            return self.llm.generate_text(prompt, n, temperature, stop, callbacks)
+
+        template = prompt.template  # type: ignore
+        embedding = self._normalize(
+            self.embeddings.embed_query(self._inputs_to_string(prompt))
+        )
+        completion = self._lookup(template, embedding)
+        if completion is None:
+            completion = self.llm.generate_text(prompt, n, temperature, stop, callbacks)
+            self._add(template, embedding, completion)
+        return completion
+
+    async def agenerate_text(
+        self,
+        prompt: PromptValue,
+        n: int = 1,
+        temperature: float = 1e-8,
+        stop: t.Optional[t.List[str]] = None,
+        callbacks: Callbacks = [],
+    ) -> LLMResult:
+        if not self._is_cacheable(prompt, n):
+            return await self.llm.agenerate_text(
+                prompt, n, temperature, stop, callbacks
+            )
+
+        template = prompt.template  # type: ignore
+        embedding = self._normalize(
+            await self.embeddings.aembed_query(self._inputs_to_string(prompt))
+        )
+        completion = self._lookup(template, embedding)
+        if completion is None:
+            completion = await self.llm.agenerate_text(
+                prompt, n, temperature, stop, callbacks
+            )
+            self._add(template, embedding, completion)
+        return completion
+
+    async def generate(
+        self,
+        prompt: PromptValue,
+        n: int = 1,
+        temperature: float = 1e-8,
+        stop: t.Optional[t.List[str]] = None,
+        callbacks: Callbacks = [],
+        is_async: bool = True,
+    ) -> LLMResult:
+        """
+        Cache misses go through the wrapped LLM's `generate`, so that it keeps
+        its own retry behaviour (e.g. OpenAIBatchLLM does not retry at all).
+        """
+        if not self._is_cacheable(prompt, n):
+            return await self.llm.generate(
+                prompt, n, temperature, stop, callbacks, is_async=is_async
+            )
+
+        template = prompt.template  # type: ignore
+        inputs = self._inputs_to_string(prompt)
+        if is_async:
+            embedding = await self.embeddings.aembed_query(inputs)
+        else:
+            loop = asyncio.get_event_loop()
+            embedding = await loop.run_in_executor(
+                None, self.embeddings.embed_query, inputs
+            )
+        normalized = self._normalize(embedding)
+        completion = self._lookup(template, normalized)
+        if completion is None:
+            completion = await self.llm.generate(
+                prompt, n, temperature, stop, callbacks, is_async=is_async
+            )
+            self._add(template, normalized, completion)
+        return completion
+
+    def set_run_config(self, run_config: RunConfig):
+        self.run_config = run_config
+        self.llm.set_run_config(run_config)
+
+
 def llm_factory(
     model: str = "gpt-3.5-turbo-16k", run_config: t.Optional[RunConfig] = None
 ) -> BaseRagasLLM:
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import typing as t
+import weakref
+
+from langchain_core.outputs import Generation, LLMResult
+
+from ragas.llms.base import BaseRagasLLM
+from ragas.run_config import RunConfig
+
+if t.TYPE_CHECKING:
+    from langchain_core.callbacks import Callbacks
+    from openai import AsyncOpenAI
+
+    from ragas.llms.prompt import PromptValue
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class OpenAIBatchLLM(BaseRagasLLM):
+    """
+    A BaseRagasLLM that runs its completions through the OpenAI Batch API,
+    which costs half as much as the regular chat completions endpoint but can
+    take up to `completion_window` to finish.
+
+    Concurrent calls to `agenerate_text` are buffered for `flush_interval`
+    seconds and submitted together as a single batch, each call waiting for
+    its own result. Only async generation is supported.
+
+    Failed requests are not retried by `generate`, since every retry would
+    queue a whole new batch. The openai client already retries the HTTP calls
+    that submit and poll the batch.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-3.5-turbo-16k",
+        client: t.Optional[AsyncOpenAI] = None,
+        flush_interval: float = 1.0,
+        poll_interval: float = 30.0,
+        max_batch_size: int = 50000,
+        completion_window: str = "24h",
+        run_config: t.Optional[RunConfig] = None,
+    ):
+        if client is None:
+            from openai import AsyncOpenAI
+
+            client = AsyncOpenAI()
+        if not hasattr(client, "batches"):
+            raise ImportError(
+                "The OpenAI Batch API is not supported by the installed openai package. Please upgrade it with `pip install -U openai`"
+            )
+        self.model = model
+        self.client = client
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.max_batch_size = max_batch_size
+        self.completion_window = completion_window
+
+        # requests waiting to be flushed, per event loop. A loop only has an
+        # entry while a flush is scheduled on it
+        self._pending: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop,
+            t.List[t.Tuple[t.Dict[str, t.Any], asyncio.Future]],
+        ] = weakref.WeakKeyDictionary()
+        self._flush_tasks: t.Set[asyncio.Future] = set()
+
+        if run_config is None:
+            run_config = RunConfig()
+        self.set_run_config(run_config)
+
+    async def generate(
+        self,
+        prompt: PromptValue,
+        n: int = 1,
+        temperature: float = 1e-8,
+        stop: t.Optional[t.List[str]] = None,
+        callbacks: Callbacks = [],
+        is_async: bool = True,
+    ) -> LLMResult:
+        if not is_async:
+            return self.generate_text(prompt, n, temperature, stop, callbacks)
+        return await self.agenerate_text(
+            prompt=prompt, n=n, temperature=temperature, stop=stop, callbacks=callbacks
+        )
+
+    def generate_text(
+        self,
+        prompt: PromptValue,
+        n: int = 1,
+        temperature: float = 1e-8,
+        stop: t.Optional[t.List[str]] = None,
+        callbacks: Callbacks = [],
+    ) -> LLMResult:
+        raise NotImplementedError(
+            "OpenAIBatchLLM only supports async generation. Please use is_async=True"
+        )
+
+    async def agenerate_text(
+        self,
+        prompt: PromptValue,
+        n: int = 1,
+        temperature: float = 1e-8,
+        stop: t.Optional[t.List[str]] = None,
+        callbacks: Callbacks = [],
+    ) -> LLMResult:
+        body: t.Dict[str, t.Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt.to_string()}],
+            "n": n,
+            "temperature": self.get_temperature(n=n),
+        }
+        if stop:
+            body["stop"] = stop
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if loop not in self._pending:
+            self._pending[loop] = []
+            flush_task = asyncio.ensure_future(self._flush(loop))
+            # keep a reference so that the task is not garbage collected
+            self._flush_tasks.add(flush_task)
+            flush_task.add_done_callback(self._flush_tasks.discard)
+        self._pending[loop].append((body, future))
+        return await future
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop):
+        pending = None
+        try:
+            await asyncio.sleep(self.flush_interval)
+            pending = self._pending.pop(loop)
+            chunks = [
+                pending[start : start + self.max_batch_size]
+                for start in range(0, len(pending), self.max_batch_size)
+            ]
+            await asyncio.gather(*[self._submit(chunk) for chunk in chunks])
+        finally:
+            # when the flush is cancelled, e.g. because the loop is shutting
+            # down, fail the requests it was responsible for so that later
+            # calls schedule a new flush instead of waiting on this one
+            if pending is None:
+                pending = self._pending.pop(loop, [])
+            for _, future in pending:
+                if not future.done():
+                    future.cancel()
+
+    async def _submit(self, requests: t.List[t.Tuple[t.Dict, asyncio.Future]]):
+        try:
+            results = await self._run_batch([body for body, _ in requests])
+        except Exception as e:
+            results = [e] * len(requests)
+        for (_, future), result in zip(requests, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _run_batch(
+        self, bodies: t.List[t.Dict[str, t.Any]]
+    ) -> t.List[t.Union[LLMResult, Exception]]:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": body,
+                }
+            )
+            for i, body in enumerate(bodies)
+        ]
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,  # type: ignore
+        )
+        logger.debug("submitted batch %s with %s requests", batch.id, len(bodies))
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(self.poll_interval)
+            batch = await self.client.batches.retrieve(batch.id)
+
+        if batch.output_file_id is None:
+            raise RuntimeError(f"OpenAI batch {batch.id} ended as {batch.status}")
+        output = await self.client.files.content(batch.output_file_id)
+        records = {}
+        for line in output.text.splitlines():
+            if line.strip():
+                record = json.loads(line)
+                records[record["custom_id"]] = record
+
+        results: t.List[t.Union[LLMResult, Exception]] = []
+        for i in range(len(bodies)):
+            record = records.get(str(i))
+            if record is None:
+                results.append(
+                    RuntimeError(f"request {i} of batch {batch.id} has no result")
+                )
+            elif record.get("error") or record["response"]["status_code"] != 200:
+                error = record.get("error") or record["response"]["body"]
+                results.append(
+                    RuntimeError(f"request {i} of batch {batch.id} failed: {error}")
+                )
+            else:
+                results.append(self._to_llm_result(record["response"]["body"]))
+        return results
+
+    @staticmethod
+    def _to_llm_result(response: t.Dict[str, t.Any]) -> LLMResult:
+        generations = [
+            Generation(text=choice["message"]["content"] or "")
+            for choice in response["choices"]
+        ]
+        return LLMResult(
+            generations=[generations],
+            llm_output={
+                "token_usage": response.get("usage"),
+                "model_name": response.get("model"),
+            },
+        )
@@ -20,6 +20,10 @@ logger = logging.getLogger(__name__)
 
 class PromptValue(BasePromptValue):
     prompt_str: str
+    # the unformatted prompt and the inputs it was formatted with, if it was
+    # created by Prompt.format
+    template: t.Optional[str] = None
+    inputs: t.Optional[t.Dict[str, t.Any]] = None
 
     def to_messages(self) -> t.List[BaseMessage]:
         """Return prompt as a list of Messages."""
@@ -144,7 +148,9 @@ class Prompt(BaseModel):
                 f"Input variables {self.input_keys} do not match with the given parameters {list(kwargs.keys())}"
             )
         prompt = self.to_string()
-        return PromptValue(prompt_str=prompt.format(**kwargs))
+        return PromptValue(
+            prompt_str=prompt.format(**kwargs), template=prompt, inputs=kwargs
+        )
 
     def adapt(
         self, language: str, llm: BaseRagasLLM, cache_dir: t.Optional[str] = None
@@ -1,3 +1,4 @@
+import logging
 import typing as t
 from dataclasses import dataclass
 
@@ -10,16 +11,19 @@ from tenacity import (
     wait_random_exponential,
 )
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class RunConfig:
     """
-    Configuration for a timeouts and retries.
+    Configuration for timeouts, retries and concurrency.
     """
 
     timeout: int = 60
     max_retries: int = 10
     max_wait: int = 60
+    max_workers: int = 16
     exception_types: t.Union[
         t.Type[BaseException],
         t.Tuple[t.Type[BaseException], ...],
@@ -46,3 +50,20 @@ def add_async_retry(fn: WrappedFn, run_config: RunConfig) -> WrappedFn:
         reraise=True,
     )
     return r.wraps(fn)
+
+
+def get_effective_max_workers(run_config: RunConfig) -> int:
+    """
+    Returns `run_config.max_workers`, halved if the CPUs of the host are already
+    more than 80% busy. The load is only checked if psutil is installed.
+    """
+    max_workers = run_config.max_workers
+    try:
+        import psutil
+    except ImportError:
+        return max_workers
+
+    if psutil.cpu_percent(interval=0.1) > 80:
+        max_workers = max(1, max_workers // 2)
+        logger.info("host CPUs are busy, limiting max_workers to %s", max_workers)
+    return max_workers
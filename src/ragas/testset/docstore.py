@@ -100,7 +100,7 @@ class DocumentStore(ABC):
         ...
 
     @abstractmethod
-    def get_random_nodes(self, k=1) -> t.List[Node]:
+    def get_random_nodes(self, k=1, seed: t.Optional[int] = None) -> t.List[Node]:
         ...
 
     @abstractmethod
@@ -115,6 +115,15 @@ class DocumentStore(ABC):
     ) -> t.Optional[Node]:
         ...
 
+    def prefetch_similar(
+        self, nodes: t.Sequence[Node], threshold: float = 0.7, top_k: int = 3
+    ):
+        """
+        Compute the `get_similar` results for the given nodes ahead of time, if
+        the docstore supports caching them.
+        """
+        ...
+
     def set_run_config(self, run_config: RunConfig):
         ...
 
@@ -190,9 +199,36 @@ class InMemoryDocumentStore(DocumentStore):
     nodes: t.List[Node] = field(default_factory=list)
     node_embeddings_list: t.List[Embedding] = field(default_factory=list)
     node_map: t.Dict[str, Node] = field(default_factory=dict)
+    embedding_batch_size: int = 2048
+    # get_similar() results keyed by (doc_id, threshold, top_k)
+    similar_nodes_cache: t.Dict[t.Tuple[str, float, int], t.List[Node]] = field(
+        default_factory=dict, repr=False
+    )
+
+    async def _embed_items(
+        self, items: t.Union[t.Sequence[Document], t.Sequence[Node]]
+    ) -> t.List[Embedding]:
+        """
+        Embed the items with a single call, falling back to one call per item
+        if the embedding provider rejects the batch, e.g. for being too large.
+        Which errors mean that is up to `embeddings.rejected_batch_exceptions`.
+        """
+        assert self.embeddings is not None, "Embeddings must be set"
 
-    def _embed_items(self, items: t.Union[t.Sequence[Document], t.Sequence[Node]]):
-        ...
+        texts = [item.page_content for item in items]
+        try:
+            # not retried, a rejected batch would be rejected every time
+            return await self.embeddings.aembed_documents(texts)
+        except self.embeddings.rejected_batch_exceptions:
+            logger.warning(
+                "batch embedding of %s items was rejected, embedding them one by one",
+                len(texts),
+                exc_info=True,
+            )
+            return [await self.embeddings.embed_text(text) for text in texts]
+        except Exception:
+            # transient errors like rate limits get the usual retries
+            return await self.embeddings.embed_texts(texts)
 
     def add_documents(self, docs: t.Sequence[Document], show_progress=True):
         """
@@ -215,43 +251,51 @@ class InMemoryDocumentStore(DocumentStore):
         assert self.extractor is not None, "Extractor must be set"
 
         # NOTE: Adds everything in async mode for now.
-        nodes_to_embed = {}
-        nodes_to_extract = {}
-
-        # get embeddings for the docs
+        nodes_to_embed = [i for i, n in enumerate(nodes) if n.embedding is None]
+        nodes_to_extract = [i for i, n in enumerate(nodes) if n.keyphrases == []]
+        # identical chunks only have to be embedded once
+        texts_to_embed: t.Dict[str, int] = {}
+        for i in nodes_to_embed:
+            texts_to_embed.setdefault(nodes[i].page_content, i)
+        unique_nodes_to_embed = list(texts_to_embed.values())
+
+        # get embeddings for the docs, batching as many nodes as the
+        # provider accepts into each request
         executor = Executor(
             desc="embedding nodes",
             keep_progress_bar=False,
             raise_exceptions=True,
         )
-        result_idx = 0
-        for i, n in enumerate(nodes):
-            if n.embedding is None:
-                nodes_to_embed.update({i: result_idx})
-                executor.submit(
-                    self.embeddings.embed_text,
-                    n.page_content,
-                    name=f"embed_node_task[{i}]",
-                )
-                result_idx += 1
-
-            if n.keyphrases == []:
-                nodes_to_extract.update({i: result_idx})
-                executor.submit(
-                    self.extractor.extract,
-                    n,
-                    name=f"keyphrase-extraction[{i}]",
-                )
-                result_idx += 1
+        embedding_batches = [
+            unique_nodes_to_embed[start : start + self.embedding_batch_size]
+            for start in range(0, len(unique_nodes_to_embed), self.embedding_batch_size)
+        ]
+        for batch_idx, batch in enumerate(embedding_batches):
+            executor.submit(
+                self._embed_items,
+                [nodes[i] for i in batch],
+                name=f"embed_nodes_task[{batch_idx}]",
+            )
+        for i in nodes_to_extract:
+            executor.submit(
+                self.extractor.extract,
+                nodes[i],
+                name=f"keyphrase-extraction[{i}]",
+            )
 
         results = executor.results()
-        for i, n in enumerate(nodes):
-            if i in nodes_to_embed.keys():
-                n.embedding = results[nodes_to_embed[i]]
-            if i in nodes_to_extract.keys():
-                keyphrases = results[nodes_to_extract[i]]
-                n.keyphrases = keyphrases
+        embeddings = [
+            embedding
+            for batch_embeddings in results[: len(embedding_batches)]
+            for embedding in batch_embeddings
+        ]
+        text_embeddings = dict(zip(texts_to_embed, embeddings))
+        for i in nodes_to_embed:
+            nodes[i].embedding = text_embeddings[nodes[i].page_content]
+        for i, keyphrases in zip(nodes_to_extract, results[len(embedding_batches) :]):
+            nodes[i].keyphrases = keyphrases
 
+        for n in nodes:
             if n.embedding is not None and n.keyphrases != []:
                 self.nodes.append(n)
                 self.node_map[n.doc_id] = n
@@ -259,6 +303,8 @@ class InMemoryDocumentStore(DocumentStore):
                     n.embedding, (list, np.ndarray)
                 ), "Embedding must be list or np.ndarray"
                 self.node_embeddings_list.append(n.embedding)
+        # similar nodes might have changed with the new nodes
+        self.similar_nodes_cache.clear()
 
     def get_node(self, node_id: str) -> Node:
         return self.node_map[node_id]
@@ -266,28 +312,57 @@ class InMemoryDocumentStore(DocumentStore):
     def get_document(self, doc_id: str) -> Node:
         raise NotImplementedError
 
-    def get_random_nodes(self, k=1) -> t.List[Node]:
-        return rng.choice(np.array(self.nodes), size=k).tolist()
+    def get_random_nodes(self, k=1, seed: t.Optional[int] = None) -> t.List[Node]:
+        if seed is None:
+            return rng.choice(np.array(self.nodes), size=k).tolist()
+        indices = np.random.default_rng(seed).choice(len(self.nodes), size=k)
+        return [self.nodes[i] for i in indices]
 
     def get_similar(
         self, node: Node, threshold: float = 0.7, top_k: int = 3
     ) -> t.Union[t.List[Document], t.List[Node]]:
-        items = []
-        doc = node
-        if doc.embedding is None:
+        cache_key = (node.doc_id, threshold, top_k)
+        if cache_key in self.similar_nodes_cache:
+            return self.similar_nodes_cache[cache_key]
+
+        if node.embedding is None:
             raise ValueError("Document has no embedding.")
-        scores, doc_ids = get_top_k_embeddings(
-            query_embedding=doc.embedding,
-            embeddings=self.node_embeddings_list,
-            similarity_fn=similarity,
-            similarity_cutoff=threshold,
-            # we need to return k+1 docs here as the top result is the input doc itself
-            similarity_top_k=top_k + 1,
-        )
-        # remove the query doc itself from results
-        scores, doc_ids = scores[1:], doc_ids[1:]
-        items = [self.nodes[doc_id] for doc_id in doc_ids]
-        return items
+        self.prefetch_similar([node], threshold=threshold, top_k=top_k)
+        return self.similar_nodes_cache.get(cache_key, [])
+
+    def prefetch_similar(
+        self, nodes: t.Sequence[Node], threshold: float = 0.7, top_k: int = 3
+    ):
+        """
+        Fill the get_similar() cache for all the given nodes at once, scoring
+        them against every node in the store with a single matrix product.
+        """
+        nodes = [
+            n
+            for n in nodes
+            if n.embedding is not None
+            and (n.doc_id, threshold, top_k) not in self.similar_nodes_cache
+        ]
+        if not nodes or not self.node_embeddings_list:
+            return
+
+        embeddings = np.array(self.node_embeddings_list, dtype=np.float64)
+        queries = np.array([n.embedding for n in nodes], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = (queries @ embeddings.T) / np.outer(
+                np.linalg.norm(queries, axis=1), np.linalg.norm(embeddings, axis=1)
+            )
+        node_ids = np.array([n.doc_id for n in self.nodes], dtype=object)
+        for node, node_scores in zip(nodes, scores):
+            # leave out the query node itself. It can't be assumed to be the
+            # top result, since chunks with the same text score the same
+            candidates = np.flatnonzero(
+                (node_scores > threshold) & (node_ids != node.doc_id)
+            )
+            ranked = candidates[np.argsort(-node_scores[candidates], kind="stable")]
+            self.similar_nodes_cache[(node.doc_id, threshold, top_k)] = [
+                self.nodes[i] for i in ranked[:top_k]
+            ]
 
     def get_adjacent(
         self, node: Node, direction: Direction = Direction.NEXT
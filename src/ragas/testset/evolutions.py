@@ -6,7 +6,6 @@ from abc import abstractmethod
 from dataclasses import dataclass, field
 
 import numpy as np
-from langchain_core.pydantic_v1 import BaseModel
 
 from ragas.exceptions import MaxRetriesExceeded
 from ragas.llms import BaseRagasLLM
@@ -39,7 +38,11 @@ class CurrentNodes:
 EvolutionOutput = t.Tuple[str, CurrentNodes, str]
 
 
-class DataRow(BaseModel):
+@dataclass
+class DataRow:
+    # one row is kept per generated question, so skip the per-instance __dict__
+    __slots__ = ("question", "contexts", "ground_truth", "evolution_type")
+
     question: str
     contexts: t.List[str]
     ground_truth: str
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
 import typing as t
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 
 from ragas.llms.json_load import json_loader
+from ragas.llms.prompt import Prompt
 from ragas.testset.prompts import keyphrase_extraction_prompt
+from ragas.utils import get_cache_dir, get_model_name
 
 if t.TYPE_CHECKING:
     from ragas.llms.base import BaseRagasLLM
-    from ragas.llms.prompt import Prompt
     from ragas.testset.docstore import Node
 
 
@@ -66,3 +70,58 @@ class keyphraseExtractor(Extractor):
         Save the extractor prompts to a path.
         """
         self.keyphrase_extraction_prompt.save(cache_dir)
+
+
+@dataclass
+class CachedExtractor(Extractor):
+    """
+    Wraps an Extractor and memoizes its outputs on disk, keyed by the sha1 of
+    the node text and the language of the extractor prompts, so that unchanged
+    documents are not sent to the LLM again. The cache is stored as JSON lines
+    in `<cache_dir>/keyphrases/<model>.jsonl`.
+    """
+
+    extractor: Extractor = field(repr=False)
+    cache_dir: t.Optional[str] = None
+    cache: t.Dict[str, t.Any] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        cache_dir = self.cache_dir if self.cache_dir is not None else get_cache_dir()
+        model_name = get_model_name(self.llm).replace("/", "_")
+        self.cache_path = os.path.join(cache_dir, "keyphrases", f"{model_name}.jsonl")
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.cache[record["key"]] = record["output"]
+
+    def _key(self, node: Node) -> str:
+        language = "english"
+        for f in fields(self.extractor):
+            value = getattr(self.extractor, f.name)
+            if isinstance(value, Prompt):
+                language = value.language
+                break
+        text_hash = hashlib.sha1(node.page_content.encode("utf-8")).hexdigest()
+        return f"{text_hash}-{language}"
+
+    async def extract(self, node: Node, is_async: bool = True) -> t.Any:
+        key = self._key(node)
+        if key in self.cache:
+            return self.cache[key]
+
+        output = await self.extractor.extract(node, is_async=is_async)
+        # don't remember failed extractions
+        if output:
+            self.cache[key] = output
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "output": output}) + "\n")
+        return output
+
+    def adapt(self, language: str, cache_dir: t.Optional[str] = None) -> None:
+        self.extractor.adapt(language, cache_dir)
+
+    def save(self, cache_dir: t.Optional[str] = None) -> None:
+        self.extractor.save(cache_dir)
@@ -1,37 +1,60 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+import math
+import os
+import threading
 import typing as t
-from dataclasses import dataclass
-from random import choices
+import weakref
+from dataclasses import asdict, dataclass, field, fields
+from itertools import chain
 
+import httpx
+import numpy as np
 import pandas as pd
 from datasets import Dataset
 from langchain_openai.chat_models import ChatOpenAI
 from langchain_openai.embeddings import OpenAIEmbeddings
+from tqdm.auto import tqdm
 
 from ragas._analytics import TesetGenerationEvent, track
-from ragas.embeddings.base import BaseRagasEmbeddings, LangchainEmbeddingsWrapper
+from ragas.async_utils import run_async
+from ragas.embeddings.base import (
+    BaseRagasEmbeddings,
+    CachedRagasEmbeddings,
+    LangchainEmbeddingsWrapper,
+)
+from ragas.exceptions import MaxRetriesExceeded
 from ragas.executor import Executor
-from ragas.llms import BaseRagasLLM, LangchainLLMWrapper
-from ragas.run_config import RunConfig
+from ragas.llms import (
+    BaseRagasLLM,
+    LangchainLLMWrapper,
+    OpenAIBatchLLM,
+    SemanticLLMCache,
+)
+from ragas.run_config import RunConfig, get_effective_max_workers
 from ragas.testset.docstore import Document, DocumentStore, InMemoryDocumentStore
 from ragas.testset.evolutions import (
     ComplexEvolution,
     CurrentNodes,
     DataRow,
     Evolution,
+    MultiContextEvolution,
     multi_context,
     reasoning,
     simple,
 )
-from ragas.testset.extractor import keyphraseExtractor
+from ragas.testset.extractor import CachedExtractor, keyphraseExtractor
 from ragas.testset.filters import EvolutionFilter, NodeFilter, QuestionFilter
-from ragas.utils import check_if_sum_is_close, is_nan
+from ragas.testset.utils import rng
+from ragas.utils import check_if_sum_is_close
 
 if t.TYPE_CHECKING:
     from langchain_core.documents import Document as LCDocument
     from llama_index.readers.schema import Document as LlamaindexDocument
+    from openai import AsyncOpenAI, OpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +62,182 @@ Distributions = t.Dict[t.Any, float]
 DEFAULT_DISTRIBUTION = {simple: 0.5, reasoning: 0.25, multi_context: 0.25}
 
 
+# api key, base url, organization and proxy
+OpenAIClientsKey = t.Tuple[
+    t.Optional[str], t.Optional[str], t.Optional[str], t.Optional[str]
+]
+
+
+class _LoopScopedAsyncOpenAI:
+    """
+    Stands in for an AsyncOpenAI client, using one real client, and so one
+    connection pool, per running event loop. Documents are added to the
+    docstore and evolutions are run on different event loops, and httpx
+    connections pooled on one loop fail when they are reused from another.
+    """
+
+    def __init__(
+        self, client: OpenAI, proxy: t.Optional[str] = None, **client_kwargs: t.Any
+    ):
+        # the sync client has the same resources, it tells which ones exist
+        self._sync_client = client
+        self._proxy = proxy
+        self._client_kwargs = client_kwargs
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, AsyncOpenAI
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> AsyncOpenAI:
+        """The client for the running event loop."""
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = AsyncOpenAI(
+                    **self._client_kwargs,
+                    http_client=httpx.AsyncClient(proxy=self._proxy),
+                )
+                self._clients[loop] = client
+        return client
+
+    def close(self):
+        """
+        Close the clients on their own event loops. Those of loops that are
+        already closed can't be closed anymore and are left to the garbage
+        collector.
+        """
+        with self._lock:
+            clients = list(self._clients.items())
+            self._clients.clear()
+        for loop, client in clients:
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+            else:
+                loop.run_until_complete(client.close())
+
+    def __getattr__(self, name: str) -> _LoopScopedResource:
+        if name.startswith("_") or not hasattr(self._sync_client, name):
+            raise AttributeError(name)
+        return _LoopScopedResource(self, (name,))
+
+
+class _LoopScopedResource:
+    """
+    An attribute of a _LoopScopedAsyncOpenAI, like `chat.completions.create`,
+    looked up on the client of the running event loop when it is called.
+    """
+
+    def __init__(self, client: _LoopScopedAsyncOpenAI, path: t.Tuple[str, ...]):
+        self._client = client
+        self._path = path
+
+    def __getattr__(self, name: str) -> _LoopScopedResource:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _LoopScopedResource(self._client, self._path + (name,))
+
+    def __call__(self, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        resource = self._client.get()
+        for name in self._path:
+            resource = getattr(resource, name)
+        return resource(*args, **kwargs)
+
+
+@dataclass
+class _SharedOpenAIClients:
+    client: OpenAI
+    async_client: _LoopScopedAsyncOpenAI
+    users: int = 0
+
+
+# OpenAI clients shared by the generators created with `with_openai`, so that
+# they reuse one connection pool per event loop. Keyed on the credentials the
+# clients were created with and closed once no generator uses them anymore
+_openai_clients: t.Dict[OpenAIClientsKey, _SharedOpenAIClients] = {}
+_openai_clients_lock = threading.Lock()
+
+
+def _get_openai_clients_key() -> OpenAIClientsKey:
+    """
+    The OpenAI settings from the environment, resolved the same way as
+    ChatOpenAI and OpenAIEmbeddings do when they create their own clients.
+    """
+    return (
+        os.environ.get("OPENAI_API_KEY"),
+        # the openai client itself falls back to OPENAI_BASE_URL
+        os.environ.get("OPENAI_API_BASE") or os.environ.get("OPENAI_BASE_URL"),
+        os.environ.get("OPENAI_ORG_ID") or os.environ.get("OPENAI_ORGANIZATION"),
+        os.environ.get("OPENAI_PROXY") or None,
+    )
+
+
+def _acquire_openai_clients(
+    key: OpenAIClientsKey,
+) -> t.Tuple[OpenAI, _LoopScopedAsyncOpenAI]:
+    with _openai_clients_lock:
+        shared = _openai_clients.get(key)
+        if shared is None:
+            from openai import OpenAI
+
+            api_key, base_url, organization, proxy = key
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                organization=organization,
+                http_client=httpx.Client(proxy=proxy),
+            )
+            shared = _SharedOpenAIClients(
+                client=client,
+                async_client=_LoopScopedAsyncOpenAI(
+                    client,
+                    proxy=proxy,
+                    api_key=api_key,
+                    base_url=base_url,
+                    organization=organization,
+                ),
+            )
+            _openai_clients[key] = shared
+        shared.users += 1
+        return shared.client, shared.async_client
+
+
+def _release_openai_clients(key: OpenAIClientsKey):
+    with _openai_clients_lock:
+        shared = _openai_clients.get(key)
+        if shared is None:
+            return
+        shared.users -= 1
+        if shared.users > 0:
+            return
+        del _openai_clients[key]
+    shared.client.close()
+    shared.async_client.close()
+
+
+def _open_checkpoint(checkpoint_path: t.Optional[str]) -> t.Optional[t.TextIO]:
+    """
+    Open the file that the rows of a generation run are written to as they
+    finish. It is truncated first, so it only ever holds the rows of the
+    current run. It is a write-only record: rows that are already in it are
+    not reused by a later run.
+    """
+    if checkpoint_path is None:
+        return None
+    return open(checkpoint_path, "w", encoding="utf-8")
+
+
+def _write_checkpoint_row(checkpoint: t.Optional[t.TextIO], row: t.Any):
+    if checkpoint is None or not isinstance(row, DataRow):
+        return
+    checkpoint.write(json.dumps(asdict(row)) + "\n")
+    checkpoint.flush()
+
+
 @dataclass
 class TestDataset:
     """
@@ -47,19 +246,19 @@ class TestDataset:
 
     test_data: t.List[DataRow]
 
-    def _to_records(self) -> t.List[t.Dict]:
-        data_samples = []
-        for data in self.test_data:
-            data_dict = dict(data)
-            data_dict["episode_done"] = True
-            data_samples.append(data_dict)
-        return data_samples
+    def _to_columns(self) -> t.Dict[str, t.List]:
+        columns = {
+            f.name: [getattr(data, f.name) for data in self.test_data]
+            for f in fields(DataRow)
+        }
+        columns["episode_done"] = [True] * len(self.test_data)
+        return columns
 
     def to_pandas(self) -> pd.DataFrame:
-        return pd.DataFrame.from_records(self._to_records())
+        return pd.DataFrame(self._to_columns())
 
     def to_dataset(self) -> Dataset:
-        return Dataset.from_list(self._to_records())
+        return Dataset.from_dict(self._to_columns())
 
 
 @dataclass
@@ -68,6 +267,11 @@ class TestsetGenerator:
     critic_llm: BaseRagasLLM
     embeddings: BaseRagasEmbeddings
     docstore: DocumentStore
+    semantic_cache_threshold: t.Optional[float] = None
+    _filter_llm: t.Optional[BaseRagasLLM] = field(default=None, init=False, repr=False)
+    _openai_clients_key: t.Optional[OpenAIClientsKey] = field(
+        default=None, init=False, repr=False
+    )
 
     @classmethod
     def with_openai(
@@ -77,13 +281,58 @@ class TestsetGenerator:
         embeddings: str = "text-embedding-ada-002",
         docstore: t.Optional[DocumentStore] = None,
         chunk_size: int = 512,
+        cache_dir: t.Optional[str] = None,
+        semantic_cache_threshold: t.Optional[float] = None,
+        use_batch_api: bool = False,
     ) -> "TestsetGenerator":
-        generator_llm_model = LangchainLLMWrapper(ChatOpenAI(model=generator_llm))
-        critic_llm_model = LangchainLLMWrapper(ChatOpenAI(model=critic_llm))
+        # one connection pool for all the LLM and embedding calls, shared with
+        # the other generators using the same credentials
+        openai_clients_key = _get_openai_clients_key()
+        client, async_client = _acquire_openai_clients(openai_clients_key)
+        generator_chat_model = LangchainLLMWrapper(
+            ChatOpenAI(
+                model=generator_llm,
+                client=client.chat.completions,
+                async_client=async_client.chat.completions,
+            )
+        )
+        if use_batch_api:
+            # half the cost, but completions can take up to a day
+            generator_llm_model: BaseRagasLLM = OpenAIBatchLLM(
+                model=generator_llm, client=async_client
+            )
+            critic_llm_model: BaseRagasLLM = OpenAIBatchLLM(
+                model=critic_llm, client=async_client
+            )
+        else:
+            generator_llm_model = generator_chat_model
+            critic_llm_model = LangchainLLMWrapper(
+                ChatOpenAI(
+                    model=critic_llm,
+                    client=client.chat.completions,
+                    async_client=async_client.chat.completions,
+                )
+            )
         embeddings_model = LangchainEmbeddingsWrapper(
-            OpenAIEmbeddings(model=embeddings)
+            OpenAIEmbeddings(
+                model=embeddings,
+                client=client.embeddings,
+                async_client=async_client.embeddings,
+            )
         )
-        keyphrase_extractor = keyphraseExtractor(llm=generator_llm_model)
+        # the keyphrases are extracted while the documents are added, which
+        # can't wait for the batch API, so they always use the regular one
+        keyphrase_extractor = keyphraseExtractor(llm=generator_chat_model)
+        if cache_dir is not None:
+            # reuse the embeddings and keyphrases of chunks seen in previous runs
+            embeddings_model = CachedRagasEmbeddings(
+                embeddings_model, cache_dir=cache_dir, model_name=embeddings
+            )
+            keyphrase_extractor = CachedExtractor(
+                llm=generator_chat_model,
+                extractor=keyphrase_extractor,
+                cache_dir=cache_dir,
+            )
         if docstore is None:
             from langchain.text_splitter import TokenTextSplitter
 
@@ -93,19 +342,27 @@ class TestsetGenerator:
                 embeddings=embeddings_model,
                 extractor=keyphrase_extractor,
             )
-            return cls(
-                generator_llm=generator_llm_model,
-                critic_llm=critic_llm_model,
-                embeddings=embeddings_model,
-                docstore=docstore,
-            )
-        else:
-            return cls(
-                generator_llm=generator_llm_model,
-                critic_llm=critic_llm_model,
-                embeddings=embeddings_model,
-                docstore=docstore,
-            )
+        generator = cls(
+            generator_llm=generator_llm_model,
+            critic_llm=critic_llm_model,
+            embeddings=embeddings_model,
+            docstore=docstore,
+            semantic_cache_threshold=semantic_cache_threshold,
+        )
+        generator._openai_clients_key = openai_clients_key
+        return generator
+
+    def close(self):
+        """
+        Release the HTTP connection pool used by a generator created with
+        `with_openai`. The pool is shared with the other generators using the
+        same credentials and is closed once none of them use it anymore. The
+        generator should not be used after this.
+        """
+        if self._openai_clients_key is None:
+            return
+        _release_openai_clients(self._openai_clients_key)
+        self._openai_clients_key = None
 
     # if you add any arguments to this function, make sure to add them to
     # generate_with_langchain_docs as well
@@ -118,6 +375,8 @@ class TestsetGenerator:
         is_async: bool = True,
         raise_exceptions: bool = True,
         run_config: t.Optional[RunConfig] = None,
+        checkpoint_path: t.Optional[str] = None,
+        seed: t.Optional[int] = None,
     ):
         # chunk documents and add to docstore
         self.docstore.add_documents(
@@ -131,6 +390,8 @@ class TestsetGenerator:
             is_async=is_async,
             run_config=run_config,
             raise_exceptions=raise_exceptions,
+            checkpoint_path=checkpoint_path,
+            seed=seed,
         )
 
     # if you add any arguments to this function, make sure to add them to
@@ -144,6 +405,8 @@ class TestsetGenerator:
         is_async: bool = True,
         raise_exceptions: bool = True,
         run_config: t.Optional[RunConfig] = None,
+        checkpoint_path: t.Optional[str] = None,
+        seed: t.Optional[int] = None,
     ):
         # chunk documents and add to docstore
         self.docstore.add_documents(
@@ -157,22 +420,41 @@ class TestsetGenerator:
             is_async=is_async,
             raise_exceptions=raise_exceptions,
             run_config=run_config,
+            checkpoint_path=checkpoint_path,
+            seed=seed,
         )
 
+    def _get_filter_llm(self) -> BaseRagasLLM:
+        """
+        The critic llm used by the filters. If `semantic_cache_threshold` is set
+        it is wrapped, once, in a SemanticLLMCache shared by all the filters,
+        which keeps a separate cache for each filter prompt.
+        """
+        if self.semantic_cache_threshold is None:
+            return self.critic_llm
+        if self._filter_llm is None:
+            self._filter_llm = SemanticLLMCache(
+                llm=self.critic_llm,
+                embeddings=self.embeddings,
+                threshold=self.semantic_cache_threshold,
+            )
+        return self._filter_llm
+
     def init_evolution(self, evolution: Evolution) -> None:
         if evolution.generator_llm is None:
             evolution.generator_llm = self.generator_llm
             if evolution.docstore is None:
                 evolution.docstore = self.docstore
 
+            filter_llm = self._get_filter_llm()
             if evolution.question_filter is None:
-                evolution.question_filter = QuestionFilter(llm=self.critic_llm)
+                evolution.question_filter = QuestionFilter(llm=filter_llm)
             if evolution.node_filter is None:
-                evolution.node_filter = NodeFilter(llm=self.critic_llm)
+                evolution.node_filter = NodeFilter(llm=filter_llm)
 
             if isinstance(evolution, ComplexEvolution):
                 if evolution.evolution_filter is None:
-                    evolution.evolution_filter = EvolutionFilter(llm=self.critic_llm)
+                    evolution.evolution_filter = EvolutionFilter(llm=filter_llm)
 
     def generate(
         self,
@@ -182,13 +464,23 @@ class TestsetGenerator:
         is_async: bool = True,
         raise_exceptions: bool = True,
         run_config: t.Optional[RunConfig] = None,
+        checkpoint_path: t.Optional[str] = None,
+        seed: t.Optional[int] = None,
     ):
         # validate distributions
-        if not check_if_sum_is_close(list(distributions.values()), 1.0, 3):
+        probabilities = list(distributions.values())
+        if not check_if_sum_is_close(probabilities, 1.0, 3):
             raise ValueError(
-                f"distributions passed do not sum to 1.0 [got {sum(list(distributions.values()))}]. Please check the distributions."
+                f"distributions passed do not sum to 1.0 [got {math.fsum(probabilities)}]. Please check the distributions."
             )
 
+        uses_batch_api = any(
+            isinstance(llm, OpenAIBatchLLM)
+            for llm in (self.generator_llm, self.critic_llm)
+        )
+        if not is_async and uses_batch_api:
+            raise ValueError("The OpenAI Batch API can only be used with is_async=True")
+
         # configure run_config for docstore
         if run_config is None:
             run_config = RunConfig(max_retries=15, max_wait=90)
@@ -208,44 +500,78 @@ class TestsetGenerator:
             patch_logger("ragas.testset.docstore", logging.DEBUG)
             patch_logger("ragas.llms.prompt", logging.DEBUG)
 
-        exec = Executor(
-            desc="Generating",
-            keep_progress_bar=True,
-            raise_exceptions=raise_exceptions,
+        # only pass the seed on if there is one, docstores written before it
+        # was added don't accept it
+        if seed is None:
+            random_nodes = self.docstore.get_random_nodes(k=test_size)
+            plan_rng = rng
+        else:
+            # independent streams for sampling the nodes and planning the
+            # evolutions, so that the two draws are not correlated
+            nodes_seed, plan_seed = np.random.SeedSequence(seed).spawn(2)
+            random_nodes = self.docstore.get_random_nodes(
+                k=test_size, seed=int(nodes_seed.generate_state(1)[0])
+            )
+            plan_rng = np.random.default_rng(plan_seed)
+        current_nodes = [CurrentNodes(root_node=n, nodes=[n]) for n in random_nodes]
+        # plan which evolution to run on each of the current nodes. the
+        # sampled counts always add up to test_size
+        pvals = np.array(probabilities, dtype=np.float64)
+        counts = plan_rng.multinomial(test_size, pvals / pvals.sum())
+        plan = list(
+            chain.from_iterable(
+                [evolution] * count for evolution, count in zip(distributions, counts)
+            )
         )
-
-        current_nodes = [
-            CurrentNodes(root_node=n, nodes=[n])
-            for n in self.docstore.get_random_nodes(k=test_size)
-        ]
-        total_evolutions = 0
-        for evolution, probability in distributions.items():
-            for i in range(round(probability * test_size)):
-                exec.submit(
-                    evolution.evolve,
-                    current_nodes[i],
-                    name=f"{evolution.__class__.__name__}-{i}",
+        jobs = list(zip(plan, current_nodes))
+
+        if is_async:
+            # the batch API queues the requests on OpenAI's side, so every
+            # evolution can wait on its batch at the same time
+            if uses_batch_api:
+                max_workers = max(len(jobs), 1)
+            else:
+                max_workers = get_effective_max_workers(run_config)
+            test_data_rows = run_async(
+                self._generate_async(
+                    jobs,
+                    max_workers=max_workers,
+                    raise_exceptions=raise_exceptions,
+                    checkpoint_path=checkpoint_path,
                 )
-                total_evolutions += 1
-        if total_evolutions <= test_size:
-            filler_evolutions = choices(
-                list(distributions), k=test_size - total_evolutions
             )
-            for evolution in filler_evolutions:
+        else:
+            exec = Executor(
+                desc="Generating",
+                keep_progress_bar=True,
+                raise_exceptions=raise_exceptions,
+            )
+            checkpoint = _open_checkpoint(checkpoint_path)
+
+            async def _evolve(evolution: Evolution, current_nodes: CurrentNodes):
+                row = await evolution.evolve(current_nodes)
+                # the Executor runs every job on one thread, so the writes
+                # don't interleave
+                _write_checkpoint_row(checkpoint, row)
+                return row
+
+            for i, (evolution, nodes) in enumerate(jobs):
                 exec.submit(
-                    evolution.evolve,
-                    current_nodes[total_evolutions],
-                    name=f"{evolution.__class__.__name__}-{total_evolutions}",
+                    _evolve,
+                    evolution,
+                    nodes,
+                    name=f"{evolution.__class__.__name__}-{i}",
                 )
-                total_evolutions += 1
-
-        try:
-            test_data_rows = exec.results()
-        except ValueError as e:
-            raise e
-        # make sure to ignore any NaNs that might have been returned
-        # due to failed evolutions. MaxRetriesExceeded is a common reason
-        test_data_rows = [r for r in test_data_rows if not is_nan(r)]
+            try:
+                results = exec.results()
+            except ValueError as e:
+                raise e
+            finally:
+                if checkpoint is not None:
+                    checkpoint.close()
+            # failed evolutions come back from the Executor as NaN.
+            # MaxRetriesExceeded is a common reason
+            test_data_rows = [r for r in results if isinstance(r, DataRow)]
         test_dataset = TestDataset(test_data=test_data_rows)
         track(
             TesetGenerationEvent(
@@ -258,6 +584,73 @@ class TestsetGenerator:
 
         return test_dataset
 
+    async def _generate_async(
+        self,
+        jobs: t.List[t.Tuple[Evolution, CurrentNodes]],
+        max_workers: int,
+        raise_exceptions: bool = True,
+        checkpoint_path: t.Optional[str] = None,
+    ) -> t.List[DataRow]:
+        """
+        Run the evolutions concurrently on the current event loop, keeping at
+        most `max_workers` of them in flight at any time. Rows are
+        collected as soon as their evolution finishes and, if `checkpoint_path`
+        is given, written to it as JSON lines (see `_open_checkpoint`). The
+        returned rows follow the order of `jobs`, leaving out the evolutions
+        that failed.
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def _evolve(
+            index: int, evolution: Evolution, current_nodes: CurrentNodes
+        ) -> t.Tuple[int, t.Optional[DataRow]]:
+            async with semaphore:
+                try:
+                    return index, await evolution.evolve(current_nodes)
+                except MaxRetriesExceeded as e:
+                    logger.warning(f"max retries exceeded for {e.evolution}")
+                except Exception as e:
+                    if raise_exceptions:
+                        raise e
+                    logger.error("Evolution raised an exception", exc_info=True)
+            return index, None
+
+        # find the nodes similar to the multi-context roots in a background
+        # thread while the evolutions are waiting on the LLMs
+        prefetch = None
+        multi_context_roots = [
+            n.root_node for e, n in jobs if isinstance(e, MultiContextEvolution)
+        ]
+        if multi_context_roots:
+            prefetch = asyncio.get_running_loop().run_in_executor(
+                None, self.docstore.prefetch_similar, multi_context_roots
+            )
+
+        tasks = [
+            asyncio.ensure_future(_evolve(i, e, n)) for i, (e, n) in enumerate(jobs)
+        ]
+        results: t.List[t.Optional[DataRow]] = [None] * len(jobs)
+        checkpoint = _open_checkpoint(checkpoint_path)
+        try:
+            for future in tqdm(
+                asyncio.as_completed(tasks),
+                desc="Generating",
+                total=len(tasks),
+                leave=True,
+            ):
+                index, row = await future
+                results[index] = row
+                _write_checkpoint_row(checkpoint, row)
+            return [row for row in results if row is not None]
+        finally:
+            # cancel whatever is still pending if one of the evolutions failed
+            for task in tasks:
+                task.cancel()
+            if checkpoint is not None:
+                checkpoint.close()
+            if prefetch is not None:
+                await asyncio.wait([prefetch])
+
     def adapt(
         self,
         language: str,
@@ -27,6 +27,25 @@ def get_debug_mode() -> bool:
         return False
 
 
+def get_model_name(model: t.Any) -> str:
+    """
+    Name of the model behind a ragas LLM or embeddings, or a langchain model,
+    falling back to the class name. Used to keep caches apart per model.
+    """
+    from ragas.embeddings.base import LangchainEmbeddingsWrapper
+    from ragas.llms.base import LangchainLLMWrapper
+
+    if isinstance(model, LangchainLLMWrapper):
+        model = model.langchain_llm
+    elif isinstance(model, LangchainEmbeddingsWrapper):
+        model = model.embeddings
+    for attr in ("model_name", "model"):
+        model_name = getattr(model, attr, None)
+        if model_name is not None:
+            return str(model_name)
+    return model.__class__.__name__
+
+
 def check_if_sum_is_close(
     values: t.List[float], close_to: float, num_places: int
 ) -> bool:
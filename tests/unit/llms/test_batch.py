@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import typing as t
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from ragas.embeddings.base import LangchainEmbeddingsWrapper
+from ragas.llms.base import SemanticLLMCache
+from ragas.llms.batch import OpenAIBatchLLM
+from ragas.llms.prompt import Prompt, PromptValue
+from ragas.run_config import RunConfig
+
+
+class ConstantEmbeddings(Embeddings):
+    def embed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> t.List[float]:
+        return [1.0, 0.0]
+
+
+class FakeBatchClient:
+    """echoes every prompt back, failing the ones that contain "fail" """
+
+    def __init__(self):
+        self.files = SimpleNamespace(create=self.create_file, content=self.content)
+        self.batches = SimpleNamespace(create=self.create_batch, retrieve=self.retrieve)
+        self.inputs: t.Dict[str, bytes] = {}
+        self.num_batches = 0
+
+    async def create_file(self, file, purpose):
+        file_id = f"file-{len(self.inputs)}"
+        self.inputs[file_id] = file[1]
+        return SimpleNamespace(id=file_id)
+
+    async def create_batch(self, input_file_id, endpoint, completion_window):
+        self.num_batches += 1
+        return SimpleNamespace(id=input_file_id, status="in_progress")
+
+    async def retrieve(self, batch_id):
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id=batch_id)
+
+    async def content(self, file_id):
+        lines = []
+        for line in self.inputs[file_id].decode("utf-8").splitlines():
+            request = json.loads(line)
+            prompt = request["body"]["messages"][0]["content"]
+            status_code = 400 if "fail" in prompt else 200
+            body = {"choices": [{"message": {"content": prompt}}]}
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": status_code, "body": body},
+                        "error": None,
+                    }
+                )
+            )
+        # results do not come back in order
+        return SimpleNamespace(text="\n".join(reversed(lines)))
+
+
+@pytest.mark.asyncio
+async def test_openai_batch_llm():
+    client = FakeBatchClient()
+    llm = OpenAIBatchLLM(client=client, flush_interval=0.01, poll_interval=0.01)  # type: ignore
+
+    results = await asyncio.gather(
+        *[llm.agenerate_text(PromptValue(prompt_str=p)) for p in ["a", "b", "c"]]
+    )
+    assert [r.generations[0][0].text for r in results] == ["a", "b", "c"]
+    assert client.num_batches == 1
+
+    with pytest.raises(RuntimeError):
+        await llm.agenerate_text(PromptValue(prompt_str="fail"))
+    with pytest.raises(NotImplementedError):
+        llm.generate_text(PromptValue(prompt_str="a"))
+
+
+def test_openai_batch_llm_after_cancelled_flush():
+    client = FakeBatchClient()
+    llm = OpenAIBatchLLM(client=client, flush_interval=0.05, poll_interval=0.01)  # type: ignore
+
+    async def timed_out_call():
+        await asyncio.wait_for(llm.agenerate_text(PromptValue(prompt_str="a")), 0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(timed_out_call())
+
+    # a new loop must schedule its own flush instead of waiting forever
+    async def call():
+        return await asyncio.wait_for(
+            llm.agenerate_text(PromptValue(prompt_str="b")), 1
+        )
+
+    result = asyncio.run(call())
+    assert result.generations[0][0].text == "b"
+
+
+@pytest.mark.asyncio
+async def test_openai_batch_llm_does_not_retry_failed_requests():
+    client = FakeBatchClient()
+    llm = OpenAIBatchLLM(client=client, flush_interval=0.01, poll_interval=0.01)  # type: ignore
+
+    with pytest.raises(RuntimeError):
+        await llm.generate(PromptValue(prompt_str="fail"))
+    assert client.num_batches == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_over_openai_batch_llm_does_not_retry():
+    client = FakeBatchClient()
+    llm = OpenAIBatchLLM(
+        client=client,  # type: ignore
+        flush_interval=0.01,
+        poll_interval=0.01,
+        run_config=RunConfig(max_retries=5),
+    )
+    cached_llm = SemanticLLMCache(llm, LangchainEmbeddingsWrapper(ConstantEmbeddings()))
+    prompt = Prompt(
+        name="echo",
+        instruction="Echo the text",
+        input_keys=["text"],
+        output_key="echo",
+    )
+
+    with pytest.raises(RuntimeError):
+        await cached_llm.generate(prompt.format(text="fail"))
+    assert client.num_batches == 1
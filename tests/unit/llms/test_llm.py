@@ -2,9 +2,13 @@ from __future__ import annotations
 
 import typing as t
 
+import pytest
+from langchain_core.embeddings import Embeddings
 from langchain_core.outputs import Generation, LLMResult
 
-from ragas.llms.base import BaseRagasLLM
+from ragas.embeddings.base import LangchainEmbeddingsWrapper
+from ragas.llms.base import BaseRagasLLM, SemanticLLMCache
+from ragas.run_config import RunConfig
 
 if t.TYPE_CHECKING:
     from ragas.llms.prompt import PromptValue
@@ -24,3 +28,63 @@ class FakeTestLLM(BaseRagasLLM):
         self, prompt: PromptValue, n=1, temperature=1e-8, stop=None, callbacks=[]
     ):
         return self.generate_text(prompt, n, temperature, stop, callbacks)
+
+
+class FakeEmbeddings(Embeddings):
+    def embed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> t.List[float]:
+        # texts ending in words that start with the same letter are "similar"
+        return [1.0, 0.0] if text.split()[-1].startswith("a") else [0.0, 1.0]
+
+
+class CountingLLM(FakeTestLLM):
+    calls: int = 0
+
+    def generate_text(
+        self, prompt: PromptValue, n=1, temperature=1e-8, stop=None, callbacks=[]
+    ):
+        self.calls += 1
+        return super().generate_text(prompt, n, temperature, stop, callbacks)
+
+
+@pytest.mark.asyncio
+async def test_semantic_llm_cache():
+    from ragas.llms.prompt import Prompt, PromptValue
+
+    question_prompt = Prompt(
+        name="question",
+        instruction="Judge the question",
+        input_keys=["question"],
+        output_key="verdict",
+    )
+    context_prompt = Prompt(
+        name="context",
+        instruction="Score the context",
+        input_keys=["context"],
+        output_key="score",
+    )
+    llm = CountingLLM(run_config=RunConfig())
+    cached_llm = SemanticLLMCache(llm, LangchainEmbeddingsWrapper(FakeEmbeddings()))
+
+    apple = question_prompt.format(question="apple")
+    result = await cached_llm.generate(apple)
+    assert result.generations[0][0].text == apple.prompt_str
+    result = await cached_llm.generate(question_prompt.format(question="avocado"))
+    assert result.generations[0][0].text == apple.prompt_str
+    result = await cached_llm.generate(question_prompt.format(question="banana"))
+    assert "banana" in result.generations[0][0].text
+    assert llm.calls == 2
+
+    # similar inputs to a different prompt are not answered from the cache
+    result = await cached_llm.generate(context_prompt.format(context="apple"))
+    assert "Score the context" in result.generations[0][0].text
+    assert llm.calls == 3
+
+    # multiple completions and prompts without a template are never cached
+    await cached_llm.generate(apple, n=2)
+    assert llm.calls == 4
+    await cached_llm.generate(PromptValue(prompt_str="apple"))
+    await cached_llm.generate(PromptValue(prompt_str="apple"))
+    assert llm.calls == 6
@@ -1 +1,66 @@
 from __future__ import annotations
+
+import typing as t
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from ragas.embeddings.base import CachedRagasEmbeddings, LangchainEmbeddingsWrapper
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls: t.List[t.List[str]] = []
+
+    def embed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        self.calls.append(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text: str) -> t.List[float]:
+        return self.embed_documents([text])[0]
+
+
+@pytest.mark.asyncio
+async def test_cached_embeddings(tmp_path):
+    fake_embeddings = CountingEmbeddings()
+    embeddings = CachedRagasEmbeddings(
+        LangchainEmbeddingsWrapper(fake_embeddings), cache_dir=str(tmp_path)
+    )
+    assert embeddings.model_name == "CountingEmbeddings"
+
+    assert embeddings.embed_documents(["a", "bb"]) == [[1.0, 0.5], [2.0, 0.5]]
+    assert await embeddings.embed_texts(["bb", "ccc", "a"]) == [
+        [2.0, 0.5],
+        [3.0, 0.5],
+        [1.0, 0.5],
+    ]
+    assert fake_embeddings.calls == [["a", "bb"], ["ccc"]]
+
+    # the cache is persisted on disk and keyed by the model name
+    embeddings = CachedRagasEmbeddings(
+        LangchainEmbeddingsWrapper(fake_embeddings), cache_dir=str(tmp_path)
+    )
+    assert embeddings.embed_documents(["ccc"]) == [[3.0, 0.5]]
+    assert len(fake_embeddings.calls) == 2
+
+    embeddings = CachedRagasEmbeddings(
+        LangchainEmbeddingsWrapper(fake_embeddings),
+        cache_dir=str(tmp_path),
+        model_name="other-model",
+    )
+    embeddings.embed_documents(["ccc"])
+    assert fake_embeddings.calls[-1] == ["ccc"]
+
+
+def test_openai_embeddings_reject_bad_requests(tmp_path):
+    from langchain_openai.embeddings import OpenAIEmbeddings
+    from openai import BadRequestError
+
+    embeddings = LangchainEmbeddingsWrapper(OpenAIEmbeddings(api_key="sk-test"))
+    assert embeddings.rejected_batch_exceptions == (BadRequestError,)
+    cached = CachedRagasEmbeddings(embeddings, cache_dir=str(tmp_path))
+    assert cached.rejected_batch_exceptions == (BadRequestError,)
+
+    # other providers don't tell rejected batches apart
+    other = LangchainEmbeddingsWrapper(CountingEmbeddings())
+    assert other.rejected_batch_exceptions == ()
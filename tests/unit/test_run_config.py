@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from ragas.run_config import RunConfig, get_effective_max_workers
+
+
+@pytest.mark.parametrize(
+    ["cpu_percent", "max_workers", "expected"],
+    [[10.0, 16, 16], [95.0, 16, 8], [95.0, 1, 1]],
+)
+def test_effective_max_workers(monkeypatch, cpu_percent, max_workers, expected):
+    fake_psutil = SimpleNamespace(cpu_percent=lambda interval: cpu_percent)
+    monkeypatch.setitem(sys.modules, "psutil", fake_psutil)
+
+    run_config = RunConfig(max_workers=max_workers)
+    assert get_effective_max_workers(run_config) == expected
+
+
+def test_effective_max_workers_without_psutil(monkeypatch):
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    assert get_effective_max_workers(RunConfig(max_workers=4)) == 4
@@ -7,7 +7,14 @@ import pytest
 from langchain.text_splitter import TokenTextSplitter
 from langchain_core.embeddings import Embeddings
 
-from ragas.testset.docstore import Direction, InMemoryDocumentStore, Node
+from ragas.embeddings.base import LangchainEmbeddingsWrapper
+from ragas.testset.docstore import (
+    Direction,
+    InMemoryDocumentStore,
+    Node,
+    get_top_k_embeddings,
+)
+from ragas.testset.extractor import Extractor
 
 
 class FakeEmbeddings(Embeddings):
@@ -32,6 +39,21 @@ class FakeEmbeddings(Embeddings):
         return self._get_embedding(text)
 
 
+class FakeExtractor(Extractor):
+    async def extract(self, node: Node, is_async: bool = True) -> t.List[str]:
+        return [node.page_content]
+
+
+class CountingEmbeddings(FakeEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.calls: t.List[t.List[str]] = []
+
+    def embed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        self.calls.append(texts)
+        return super().embed_documents(texts)
+
+
 def test_adjacent_nodes():
     a1 = Node(doc_id="a1", page_content="a1", filename="a")
     a2 = Node(doc_id="a2", page_content="a2", filename="a")
@@ -106,6 +128,53 @@ def test_similar_nodes_scaled():
     assert store.get_similar(a2)[0] == a1
 
 
+def get_similar_reference(
+    nodes: t.List[Node], node: Node, threshold: float, top_k: int
+) -> t.List[Node]:
+    """get_similar, one node at a time with get_top_k_embeddings"""
+    others = [n for n in nodes if n.doc_id != node.doc_id]
+    _, indices = get_top_k_embeddings(
+        node.embedding,  # type: ignore
+        [n.embedding for n in others],  # type: ignore
+        similarity_top_k=top_k,
+        similarity_cutoff=threshold,
+    )
+    return [others[i] for i in indices]
+
+
+def test_prefetch_similar_nodes():
+    a1, a2, b = create_test_nodes()
+    nodes = [a1, a2, b] + [b] * 100
+    store = InMemoryDocumentStore(splitter=None, embeddings=FakeEmbeddings())  # type: ignore
+    store.nodes = nodes
+    store.node_embeddings_list = [d.embedding for d in store.nodes]
+    store.prefetch_similar([a1, a2, b], threshold=0.1, top_k=3)
+    assert len(store.similar_nodes_cache) == 3
+
+    assert store.get_similar(a1, threshold=0.1) == [a2, b, b]
+    assert store.get_similar(a2, threshold=0.1) == [a1, b, b]
+    assert store.get_similar(b, threshold=0.1) == [a2, a1]
+    for node in [a1, a2, b]:
+        assert store.get_similar(node, threshold=0.1) == get_similar_reference(
+            nodes, node, threshold=0.1, top_k=3
+        )
+
+
+def test_similar_nodes_excludes_query_with_duplicate_text():
+    a1, a2, b = create_test_nodes()
+    duplicate = Node(
+        doc_id="duplicate",
+        page_content=a1.page_content,
+        filename="c",
+        embedding=a1.embedding,
+    )
+    store = InMemoryDocumentStore(splitter=None, embeddings=FakeEmbeddings())  # type: ignore
+    store.nodes = [duplicate, a1, a2]
+    store.node_embeddings_list = [d.embedding for d in store.nodes]
+
+    assert store.get_similar(a1, threshold=0.1, top_k=2) == [duplicate, a2]
+
+
 @pytest.fixture
 def test_docstore_add(fake_llm):
     a1, a2, b = create_test_nodes()
@@ -166,3 +235,90 @@ def test_docstore_add_batch(fake_llm):
     assert len(store.nodes) == 5
     assert len(store.node_embeddings_list) == 5
     assert len(store.node_map) == 5
+
+
+def test_docstore_add_nodes_batches_embeddings():
+    fake_embeddings = CountingEmbeddings()
+    store = InMemoryDocumentStore(
+        splitter=None,  # type: ignore
+        embeddings=LangchainEmbeddingsWrapper(fake_embeddings),
+        extractor=FakeExtractor(llm=None),  # type: ignore
+        embedding_batch_size=2,
+    )
+
+    nodes = create_test_nodes(with_embeddings=False)
+    store.add_nodes(nodes)
+
+    assert sorted(fake_embeddings.calls) == [["cat", "mouse"], ["solar_system"]]
+    assert [n.embedding for n in store.nodes] == [
+        fake_embeddings.embeddings[n.page_content] for n in nodes
+    ]
+    assert [n.keyphrases for n in store.nodes] == [[n.page_content] for n in nodes]
+
+
+class BatchTooLargeError(Exception):
+    pass
+
+
+class BatchLimitEmbeddings(CountingEmbeddings):
+    """rejects batches of more than one text, like a provider's size limit"""
+
+    def embed_documents(self, texts: t.List[str]) -> t.List[t.List[float]]:
+        if len(texts) > 1:
+            self.calls.append(texts)
+            raise BatchTooLargeError("batch too large")
+        return super().embed_documents(texts)
+
+
+def test_docstore_add_nodes_falls_back_on_rejected_batch():
+    fake_embeddings = BatchLimitEmbeddings()
+    embeddings = LangchainEmbeddingsWrapper(fake_embeddings)
+    embeddings.rejected_batch_exceptions = (BatchTooLargeError,)
+    store = InMemoryDocumentStore(
+        splitter=None,  # type: ignore
+        embeddings=embeddings,
+        extractor=FakeExtractor(llm=None),  # type: ignore
+    )
+
+    nodes = create_test_nodes(with_embeddings=False)
+    store.add_nodes(nodes)
+
+    # the rejected batch is not retried before falling back
+    assert sorted(fake_embeddings.calls) == [
+        ["cat"],
+        ["cat", "mouse", "solar_system"],
+        ["mouse"],
+        ["solar_system"],
+    ]
+    assert [n.embedding for n in store.nodes] == [
+        fake_embeddings.embeddings[n.page_content] for n in nodes
+    ]
+
+
+def test_docstore_add_nodes_embeds_duplicates_once():
+    fake_embeddings = CountingEmbeddings()
+    store = InMemoryDocumentStore(
+        splitter=None,  # type: ignore
+        embeddings=LangchainEmbeddingsWrapper(fake_embeddings),
+        extractor=FakeExtractor(llm=None),  # type: ignore
+    )
+
+    nodes = [
+        Node(doc_id=str(i), page_content=text, filename="a")
+        for i, text in enumerate(["cat", "mouse", "cat", "cat"])
+    ]
+    store.add_nodes(nodes)
+
+    assert fake_embeddings.calls == [["cat", "mouse"]]
+    assert len(store.nodes) == 4
+    assert store.get_node("3").embedding == fake_embeddings.embeddings["cat"]
+
+
+def test_seeded_random_nodes():
+    store = InMemoryDocumentStore(splitter=None)  # type: ignore
+    store.nodes = [Node(doc_id=str(i), page_content=str(i)) for i in range(100)]
+
+    nodes = store.get_random_nodes(k=5, seed=7)
+    assert len(nodes) == 5
+    assert store.get_random_nodes(k=5, seed=7) == nodes
+    assert store.get_random_nodes(k=5, seed=8) != nodes
@@ -0,0 +1,46 @@
+import typing as t
+
+import pytest
+
+from ragas.testset.docstore import Node
+from ragas.testset.extractor import CachedExtractor, keyphraseExtractor
+
+
+class CountingExtractor(keyphraseExtractor):
+    calls: int = 0
+
+    async def extract(self, node: Node, is_async: bool = True) -> t.List[str]:
+        self.calls += 1
+        return [] if node.page_content == "empty" else [node.page_content.upper()]
+
+
+@pytest.mark.asyncio
+async def test_cached_extractor(tmp_path):
+    extractor = CountingExtractor(llm=None)  # type: ignore
+    cached_extractor = CachedExtractor(
+        llm=None, extractor=extractor, cache_dir=str(tmp_path)  # type: ignore
+    )
+
+    node = Node(page_content="cat")
+    assert await cached_extractor.extract(node) == ["CAT"]
+    assert await cached_extractor.extract(Node(page_content="cat")) == ["CAT"]
+    assert extractor.calls == 1
+
+    # empty results are not cached
+    await cached_extractor.extract(Node(page_content="empty"))
+    await cached_extractor.extract(Node(page_content="empty"))
+    assert extractor.calls == 3
+
+    # the cache is persisted on disk
+    cached_extractor = CachedExtractor(
+        llm=None, extractor=extractor, cache_dir=str(tmp_path)  # type: ignore
+    )
+    assert await cached_extractor.extract(node) == ["CAT"]
+    assert extractor.calls == 3
+
+    # and keyed by the language of the prompt
+    extractor.keyphrase_extraction_prompt = extractor.keyphrase_extraction_prompt.copy(
+        update={"language": "spanish"}
+    )
+    await cached_extractor.extract(node)
+    assert extractor.calls == 4
@@ -0,0 +1,415 @@
+import asyncio
+import json
+import threading
+import typing as t
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ragas.run_config import RunConfig
+from ragas.testset import generator as testset_generator
+from ragas.testset.docstore import InMemoryDocumentStore, Node
+from ragas.testset.evolutions import DataRow
+
+
+class FakeEvolution:
+    def __init__(self, fail_on: t.Optional[int] = None):
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def evolve(self, current_nodes):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if current_nodes == self.fail_on:
+            raise ValueError("evolution failed")
+        return current_nodes
+
+
+class NamedEvolution:
+    """turns the root node of its current nodes into a DataRow"""
+
+    generator_llm = "fake"
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def init(self, is_async=True, run_config=None):
+        pass
+
+    async def evolve(self, current_nodes):
+        return DataRow(
+            question=current_nodes.root_node.doc_id,
+            contexts=[current_nodes.root_node.page_content],
+            ground_truth="",
+            evolution_type=self.name,
+        )
+
+
+class LegacyDocStore:
+    """a docstore written before get_random_nodes took a seed"""
+
+    def __init__(self, num_nodes: int):
+        self.nodes = [
+            Node(doc_id=str(i), page_content=str(i)) for i in range(num_nodes)
+        ]
+
+    def set_run_config(self, run_config):
+        pass
+
+    def get_random_nodes(self, k=1):
+        return self.nodes[:k]
+
+
+@pytest.fixture
+def generator():
+    return testset_generator.TestsetGenerator(
+        generator_llm=None,  # type: ignore
+        critic_llm=None,  # type: ignore
+        embeddings=None,  # type: ignore
+        docstore=None,  # type: ignore
+    )
+
+
+def test_generate_async_respects_max_workers(generator):
+    evolution = FakeEvolution()
+    jobs = [(evolution, i) for i in range(10)]
+
+    results = asyncio.run(
+        generator._generate_async(jobs, max_workers=3)  # type: ignore
+    )
+
+    assert results == list(range(10))
+    assert evolution.max_in_flight == 3
+
+
+def test_generate_async_exceptions(generator):
+    evolution = FakeEvolution(fail_on=2)
+    jobs = [(evolution, i) for i in range(4)]
+
+    with pytest.raises(ValueError):
+        asyncio.run(generator._generate_async(jobs, max_workers=16))  # type: ignore
+
+    results = asyncio.run(
+        generator._generate_async(
+            jobs, max_workers=16, raise_exceptions=False  # type: ignore
+        )
+    )
+    assert results == [0, 1, 3]
+
+
+def test_testdataset_conversions():
+    rows = [
+        DataRow(
+            question=f"q{i}",
+            contexts=[f"c{i}"],
+            ground_truth=f"a{i}",
+            evolution_type="simple",
+        )
+        for i in range(3)
+    ]
+    test_dataset = testset_generator.TestDataset(test_data=rows)
+
+    df = test_dataset.to_pandas()
+    assert list(df.columns) == [
+        "question",
+        "contexts",
+        "ground_truth",
+        "evolution_type",
+        "episode_done",
+    ]
+    assert df["question"].tolist() == ["q0", "q1", "q2"]
+    assert df["contexts"].tolist() == [["c0"], ["c1"], ["c2"]]
+    assert df["episode_done"].all()
+
+    ds = test_dataset.to_dataset()
+    assert ds.column_names == list(df.columns)
+    assert ds[1] == {**asdict(rows[1]), "episode_done": True}
+
+
+def test_datarow_has_no_dict():
+    row = DataRow(question="q", contexts=[], ground_truth="a", evolution_type="simple")
+    assert not hasattr(row, "__dict__")
+
+
+def test_generate_async_checkpoint(generator, tmp_path):
+    class RowEvolution(FakeEvolution):
+        async def evolve(self, current_nodes):
+            await super().evolve(current_nodes)
+            return DataRow(
+                question=f"q{current_nodes}",
+                contexts=[],
+                ground_truth="",
+                evolution_type="simple",
+            )
+
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    jobs = [(RowEvolution(fail_on=1), i) for i in range(3)]
+    # a second run with the same path replaces the rows of the first
+    for _ in range(2):
+        results = asyncio.run(
+            generator._generate_async(
+                jobs,  # type: ignore
+                max_workers=16,
+                raise_exceptions=False,
+                checkpoint_path=str(checkpoint_path),
+            )
+        )
+
+    assert [row.question for row in results] == ["q0", "q2"]
+    lines = checkpoint_path.read_text().splitlines()
+    assert sorted(json.loads(line)["question"] for line in lines) == ["q0", "q2"]
+
+
+def test_generate_sync_checkpoint(generator, monkeypatch, tmp_path):
+    monkeypatch.setattr(testset_generator, "track", lambda event: None)
+    generator.docstore = LegacyDocStore(num_nodes=3)
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    checkpoint_path.write_text("stale\n")
+
+    generator.generate(
+        test_size=3,
+        distributions={NamedEvolution("simple"): 1.0},
+        is_async=False,
+        checkpoint_path=str(checkpoint_path),
+    )
+
+    lines = checkpoint_path.read_text().splitlines()
+    assert sorted(json.loads(line)["question"] for line in lines) == ["0", "1", "2"]
+
+
+def test_with_openai_shares_http_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    generator = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    generator_llm = generator.generator_llm.langchain_llm  # type: ignore
+    critic_llm = generator.critic_llm.langchain_llm  # type: ignore
+    embeddings = generator.embeddings.embeddings  # type: ignore
+
+    assert generator_llm.client._client is critic_llm.client._client
+    assert embeddings.client._client is generator_llm.client._client
+    assert critic_llm.async_client._client is generator_llm.async_client._client
+    assert embeddings.async_client._client is generator_llm.async_client._client
+
+    http_client = generator_llm.client._client._client
+    generator.close()
+    assert http_client.is_closed
+    assert generator._openai_clients_key is None
+
+
+def test_with_openai_reuses_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-old")
+    first = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    second = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-new")
+    other = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+
+    first_client = first.generator_llm.langchain_llm.client._client  # type: ignore
+    second_client = second.generator_llm.langchain_llm.client._client  # type: ignore
+    other_client = other.generator_llm.langchain_llm.client._client  # type: ignore
+    assert second_client is first_client
+    assert other_client.api_key == "sk-new"
+
+    # the wrappers are not shared, only the clients
+    assert second.generator_llm is not first.generator_llm
+    first.generator_llm.set_run_config(RunConfig(timeout=5))
+    assert second.generator_llm.run_config.timeout != 5
+
+    # the pool stays open while another generator still uses it
+    http_client = first_client._client
+    first.close()
+    assert not http_client.is_closed
+    second.close()
+    assert http_client.is_closed
+    other.close()
+
+
+def test_with_openai_reads_langchain_environment(monkeypatch):
+    for name in ["OPENAI_BASE_URL", "OPENAI_ORG_ID", "OPENAI_PROXY"]:
+        monkeypatch.delenv(name, raising=False)
+    # httpx would pick these up on its own
+    for name in ["HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY"]:
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.lower(), raising=False)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_API_BASE", "http://proxy.local/v1")
+    monkeypatch.setenv("OPENAI_ORGANIZATION", "org-test")
+    generator = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    client = generator.generator_llm.langchain_llm.client._client  # type: ignore
+    assert str(client.base_url) == "http://proxy.local/v1/"
+    assert client.organization == "org-test"
+    assert not client._client._mounts
+
+    # a proxy gets its own clients
+    monkeypatch.setenv("OPENAI_PROXY", "http://localhost:3128")
+    proxied = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    proxied_client = proxied.generator_llm.langchain_llm.client._client  # type: ignore
+    assert proxied_client is not client
+    assert proxied_client._client._mounts
+    generator.close()
+    proxied.close()
+
+
+@pytest.fixture
+def openai_server(monkeypatch):
+    """a local OpenAI API that answers every chat completion with "ok" """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        paths: t.List[str] = []
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self.paths.append(self.path)
+            body = json.dumps(
+                {
+                    "id": "chatcmpl-1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "gpt-4",
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "ok"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    yield Handler
+    server.shutdown()
+    server.server_close()
+
+
+def test_with_openai_clients_across_event_loops(openai_server):
+    from ragas.llms.prompt import PromptValue
+
+    generator = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    prompt = PromptValue(prompt_str="hi")
+
+    # documents are added on the Executor's loop, which is left open, and the
+    # evolutions run on a new one
+    executor_loop = asyncio.new_event_loop()
+    executor_loop.run_until_complete(generator.generator_llm.generate(prompt))
+    asyncio.run(generator.critic_llm.generate(prompt))
+    asyncio.run(generator.generator_llm.generate(prompt))
+
+    # no request had to be retried on a connection from another loop
+    assert openai_server.paths == ["/v1/chat/completions"] * 3
+    generator.close()
+    executor_loop.close()
+
+
+def test_with_openai_generators_on_separate_event_loops(openai_server):
+    from ragas.llms.prompt import PromptValue
+
+    prompt = PromptValue(prompt_str="hi")
+    first = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    asyncio.run(first.critic_llm.generate(prompt))
+    # shares the clients of the first generator, whose loop is now closed
+    second = testset_generator.TestsetGenerator.with_openai(
+        docstore=object()  # type: ignore
+    )
+    asyncio.run(second.critic_llm.generate(prompt))
+
+    assert openai_server.paths == ["/v1/chat/completions"] * 2
+    first.close()
+    second.close()
+
+
+class WaitingEvolution(NamedEvolution):
+    """waits like an evolution whose requests sit in an OpenAI batch"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def evolve(self, current_nodes):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return await super().evolve(current_nodes)
+
+
+def test_generate_with_batch_api_runs_every_evolution_at_once(generator, monkeypatch):
+    from types import SimpleNamespace
+
+    from ragas.llms.batch import OpenAIBatchLLM
+
+    monkeypatch.setattr(testset_generator, "track", lambda event: None)
+    generator.generator_llm = OpenAIBatchLLM(client=SimpleNamespace(batches=None))  # type: ignore
+    generator.docstore = LegacyDocStore(num_nodes=40)
+    evolution = WaitingEvolution("simple")
+
+    generator.generate(
+        test_size=40, distributions={evolution: 1.0}, run_config=RunConfig()
+    )
+
+    # not capped by the number of workers of the run config
+    assert evolution.max_in_flight == 40
+
+
+def test_generate_without_seed_on_legacy_docstore(generator, monkeypatch):
+    monkeypatch.setattr(testset_generator, "track", lambda event: None)
+    generator.docstore = LegacyDocStore(num_nodes=5)
+    distributions = {NamedEvolution("simple"): 0.5, NamedEvolution("reasoning"): 0.5}
+
+    test_dataset = generator.generate(test_size=5, distributions=distributions)
+
+    assert [row.question for row in test_dataset.test_data] == ["0", "1", "2", "3", "4"]
+
+
+def test_generate_with_seed_is_reproducible(generator, monkeypatch):
+    monkeypatch.setattr(testset_generator, "track", lambda event: None)
+    store = InMemoryDocumentStore(splitter=None)  # type: ignore
+    store.nodes = [Node(doc_id=str(i), page_content=str(i)) for i in range(50)]
+    generator.docstore = store
+    distributions = {
+        NamedEvolution("simple"): 0.5,
+        NamedEvolution("reasoning"): 0.25,
+        NamedEvolution("multi_context"): 0.25,
+    }
+
+    def generate(seed):
+        test_dataset = generator.generate(
+            test_size=20, distributions=distributions, seed=seed
+        )
+        return [(row.question, row.evolution_type) for row in test_dataset.test_data]
+
+    rows = generate(seed=42)
+    assert len(rows) == 20
+    assert generate(seed=42) == rows
+    assert generate(seed=43) != rows